@@ -1,32 +1,110 @@
-import json
+import select
+import socket
 import threading
 import time
 import websocket
 import logging
 
+# Prefer orjson for message parsing; it is a C extension and is
+# significantly faster than the stdlib on the per-tick hot path.
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# Byte-level fast path for aggTrade frames: we only consume the "p"
+# (price) field, so scan for it directly instead of tokenizing the
+# whole JSON object. Str variants cover websocket-client's default
+# text-frame delivery.
+_P_TAG_B, _Q_TAG_B, _M_TAG_B = b'"p":"', b'"q"', b'"m"'
+_P_TAG_S, _Q_TAG_S, _M_TAG_S = '"p":"', '"q"', '"m"'
+
 class BinanceWebsocket:
     def __init__(self, stream_url="wss://fstream.binance.com/ws", subscribe_params=["btcusdt@aggTrade"], reconnect_interval=10):
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Checked once so the hot path can skip debug-call argument setup.
+        self._debug = self.logger.isEnabledFor(logging.DEBUG)
         self.stream_url = stream_url
         self.subscribe_params = subscribe_params
         self.reconnect_interval = reconnect_interval  # seconds without update before reconnecting
-        self.current_price = None
-        self.last_update_time = time.time()
+        # (price, monotonic nanosecond timestamp) swapped atomically with
+        # a single attribute store, so readers never need the lock.
+        # Integer nanos avoid per-tick float allocation and clock skew.
+        self._state = (None, time.monotonic_ns())
         self.ws_app = None
         self._stop_event = threading.Event()
+        # Set on every price update; the watchdog waits on it instead of
+        # polling.
+        self._msg_event = threading.Event()
+        # Notified per tick so consumers can block on fresh prices
+        # instead of sleep-polling.
+        self._price_cond = threading.Condition()
+        # Subscribe payload is fixed for the lifetime of this instance;
+        # build it once instead of on every (re)connect.
+        payload = _json.dumps({
+            "method": "SUBSCRIBE",
+            "params": self.subscribe_params,
+            "id": 1
+        })
+        self._subscribe_payload = payload.decode() if isinstance(payload, bytes) else payload
+        # Lock only guards reconnect teardown, not the tick path.
         self._lock = threading.Lock()
 
-    def _on_message(self, ws, message):
+    @property
+    def current_price(self):
+        return self._state[0]
+
+    @property
+    def last_update_time(self):
+        """Monotonic timestamp of the last price update, in nanoseconds."""
+        return self._state[1]
+
+    def _extract_price(self, message):
+        """
+        Pull the price out of an aggTrade frame without a full JSON parse.
+        Returns None when the frame does not look like an aggTrade update.
+        Falls back to a real JSON decode on any scan failure.
+        """
+        p_tag, q_tag, m_tag, quote = (
+            (_P_TAG_B, _Q_TAG_B, _M_TAG_B, b'"')
+            if isinstance(message, bytes)
+            else (_P_TAG_S, _Q_TAG_S, _M_TAG_S, '"')
+        )
+        try:
+            i = message.find(p_tag)
+            if i >= 0 and message.find(q_tag) >= 0 and message.find(m_tag) >= 0:
+                j = message.find(quote, i + 5)
+                if j > i:
+                    return float(message[i + 5:j])
+                return None
+        except Exception:
+            pass
+        # Fallback: full decode with the same validation as before.
+        data = _json.loads(message)
+        if "p" not in data or "q" not in data or "m" not in data:
+            return None
+        return float(data["p"])
+
+    def _on_message(self, ws, message, _monotonic_ns=time.monotonic_ns):
+        # _monotonic_ns is bound as a default arg so the per-tick lookup
+        # is LOAD_FAST instead of a module attribute chain.
         try:
-            data = json.loads(message)
-            # Validate that required keys exist.
-            if "p" not in data or "q" not in data or "m" not in data:
+            # Subscribe acks and other control frames carry no "p" field;
+            # reject them with one bounded find instead of a JSON parse.
+            # aggTrade frames place "p" within the first ~60 bytes, so a
+            # 96-byte window leaves headroom.
+            p_tag = _P_TAG_B if isinstance(message, (bytes, bytearray)) else _P_TAG_S
+            if message.find(p_tag, 0, 96) < 0:
                 return
-            price = float(data["p"])
-            with self._lock:
-                self.current_price = price
-                self.last_update_time = time.time()
-            self.logger.debug("Received price update: %s", price)
+            price = self._extract_price(message)
+            if price is None:
+                return
+            self._state = (price, _monotonic_ns())
+            self._msg_event.set()
+            with self._price_cond:
+                self._price_cond.notify_all()
+            if self._debug:
+                self.logger.debug("Received price update: %s", price)
         except Exception as e:
             self.logger.error("Error processing message: %s", e)
 
@@ -38,25 +116,97 @@ class BinanceWebsocket:
 
     def _on_open(self, ws):
         self.logger.info("WebSocket connection opened")
-        subscribe_message = {
-            "method": "SUBSCRIBE",
-            "params": self.subscribe_params,
-            "id": 1
-        }
-        ws.send(json.dumps(subscribe_message))
-        self.logger.debug("Sent subscription message: %s", subscribe_message)
+        ws.send(self._subscribe_payload)
+        self.logger.debug("Sent subscription message: %s", self._subscribe_payload)
+
+    def wait_for_price_update(self, timeout=None):
+        """
+        Block until the next price update arrives (or the timeout
+        elapses) and return the latest price, which may be None if no
+        tick has been seen yet. Lets consumers react per tick instead of
+        polling on a fixed interval.
+        """
+        with self._price_cond:
+            self._price_cond.wait(timeout)
+        return self._state[0]
+
+    @staticmethod
+    def _has_buffered(ws):
+        """
+        True when frame data may already be waiting beyond the raw fd:
+        bytes decrypted inside the TLS object, or leftovers in
+        websocket-client's frame buffer from the previous recv. select()
+        on the socket alone misses both, so a queued tick could sit
+        undelivered until new wire bytes arrive.
+        """
+        sock = ws.sock
+        try:
+            if sock is not None and hasattr(sock, 'pending') and sock.pending():
+                return True
+        except Exception:
+            pass
+        frame_buf = getattr(ws, 'frame_buffer', None)
+        return bool(frame_buf is not None and getattr(frame_buf, 'recv_buffer', None))
 
     def _start_socket(self):
-        self.ws_app = websocket.WebSocketApp(
-            self.stream_url,
-            on_message=self._on_message,
-            on_error=self._on_error,
-            on_close=self._on_close
-        )
-        self.ws_app.on_open = self._on_open
+        """
+        Connect and drain frames in a select-driven loop. When a burst of
+        frames is queued, only the newest data frame is parsed -- the
+        consumers only care about price freshness, so intermediate ticks
+        can be dropped without a JSON parse each.
+        """
         self.logger.info("Starting WebSocket connection to %s", self.stream_url)
-        self.ws_app.run_forever()
-        self.logger.info("WebSocket run_forever loop exited")
+        try:
+            # skip_utf8_validation drops websocket-client's Python-level
+            # UTF-8 pass over every frame; the JSON parser validates
+            # anyway. enable_multithread keeps sends from the watchdog
+            # safe alongside this receive loop.
+            # TCP_NODELAY avoids Nagle-delaying our pongs/subscribes; a
+            # 1 MiB receive buffer lets the kernel hold tick bursts so
+            # each select wakeup drains more frames per syscall.
+            ws = websocket.create_connection(
+                self.stream_url,
+                skip_utf8_validation=True,
+                enable_multithread=True,
+                sockopt=(
+                    (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                    (socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20),
+                ),
+            )
+        except Exception as e:
+            self.logger.error("Error opening websocket: %s", e)
+            return
+        self.ws_app = ws
+        self._on_open(ws)
+        try:
+            while not self._stop_event.is_set() and ws.connected:
+                ready = self._has_buffered(ws) or select.select([ws.sock], [], [], 1.0)[0]
+                last_frame = None
+                closing = False
+                while ready:
+                    opcode, data = ws.recv_data()
+                    if opcode in (websocket.ABNF.OPCODE_TEXT, websocket.ABNF.OPCODE_BINARY):
+                        last_frame = data
+                    elif opcode == websocket.ABNF.OPCODE_CLOSE:
+                        closing = True
+                        break
+                    # Drain whatever else is already buffered, whether on
+                    # the fd (timeout-0 select) or past it.
+                    ready = select.select([ws.sock], [], [], 0)[0] or self._has_buffered(ws)
+                if last_frame is not None:
+                    self._on_message(ws, last_frame)
+                if closing:
+                    break
+        except Exception as e:
+            if not self._stop_event.is_set():
+                self._on_error(ws, e)
+        finally:
+            try:
+                ws.close()
+            except Exception:
+                pass
+            self._on_close(ws, None, None)
+        self.logger.info("WebSocket receive loop exited")
 
     def start(self):
         """
@@ -71,14 +221,18 @@ class BinanceWebsocket:
 
     def _monitor_connection(self):
         """
-        Monitor live price updates and reconnect if no update is received within the reconnection interval.
+        Event-driven watchdog: sleeps until either a price update arrives
+        or the reconnect interval elapses with no update, in which case
+        the socket is restarted. No periodic polling while healthy.
         """
         while not self._stop_event.is_set():
-            time.sleep(3)
+            self._msg_event.clear()
+            if self._msg_event.wait(self.reconnect_interval):
+                continue
+            if self._stop_event.is_set():
+                break
+            self.logger.warning("No price update in last %s seconds. Reconnecting...", self.reconnect_interval)
             with self._lock:
-                time_since_update = time.time() - self.last_update_time
-            if time_since_update > self.reconnect_interval:
-                self.logger.warning("No price update in last %s seconds. Reconnecting...", self.reconnect_interval)
                 try:
                     if self.ws_app:
                         self.ws_app.close()
@@ -93,6 +247,7 @@ class BinanceWebsocket:
         Stop the websocket connection and monitoring.
         """
         self._stop_event.set()
+        self._msg_event.set()  # wake the watchdog so it can exit promptly
         if self.ws_app:
             self.ws_app.close()
         if self.socket_thread.is_alive():
@@ -107,9 +262,9 @@ if __name__ == "__main__":
     ws.start()
     try:
         while True:
-            with ws._lock:
-                if ws.current_price is not None:
-                    print(f"Latest BTC/USDT price: {ws.current_price}")
+            price, _ = ws._state
+            if price is not None:
+                print(f"Latest BTC/USDT price: {price}")
             time.sleep(2)
     except KeyboardInterrupt:
         ws.stop()
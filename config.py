@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
 from dataclasses import dataclass
+from types import MappingProxyType
 
 # Load environment variables from .env file if present.
 load_dotenv()
@@ -18,48 +19,45 @@ ORDER_SL_OFFSET_PERCENT = float(os.getenv("ORDER_SL_OFFSET_PERCENT", "0.60"))
 ORDER_TP_OFFSET_PERCENT = float(os.getenv("ORDER_TP_OFFSET_PERCENT", "3.61"))
 FIXED_STOP_OFFSET_PERCENT = float(os.getenv("FIXED_STOP_OFFSET_PERCENT", "0.60"))
 
-@dataclass(frozen=True)
-class NgrokConfig:
-    domain: str = os.getenv("NGROK_DOMAIN", "https://octopus-absolute-frequently.ngrok-free.app")
-
-@dataclass(frozen=True)
-class DeltaApiUrls:
-    public: str = os.getenv("DELTA_PUBLIC_URL", "https://api.india.delta.exchange")
-    private: str = os.getenv("DELTA_PRIVATE_URL", "https://api.india.delta.exchange")
+# ---- Service endpoints ----
+NGROK_DOMAIN = os.getenv("NGROK_DOMAIN", "https://octopus-absolute-frequently.ngrok-free.app")
+DELTA_API_URLS = {
+    "public": os.getenv("DELTA_PUBLIC_URL", "https://api.india.delta.exchange"),
+    "private": os.getenv("DELTA_PRIVATE_URL", "https://api.india.delta.exchange"),
+}
 
-@dataclass(frozen=True)
-class TradingParameters:
-    default_order_type: str = 'limit'
-    trailing_stop_percent: float = 2.0  # 2% trailing stop
-    basket_order_enabled: bool = True
+# ---- Trading parameters ----
+DEFAULT_ORDER_TYPE = 'limit'
+TRAILING_STOP_PERCENT = 2.0  # 2% trailing stop
+BASKET_ORDER_ENABLED = True
 
-@dataclass(frozen=True)
-class LoggingConfig:
-    log_file: str = os.getenv('LOG_FILE', 'trading.log')
-    log_level: str = os.getenv('LOG_LEVEL', 'DEBUG')
+# ---- Logging ----
+LOG_FILE = os.getenv('LOG_FILE', 'trading.log')
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
 
-@dataclass(frozen=True)
-class RedisConfig:
-    host: str = os.getenv('REDIS_HOST', 'localhost')
-    port: int = int(os.getenv('REDIS_PORT', '6379'))
-    db: int = int(os.getenv('REDIS_DB', '0'))
+# ---- Redis ----
+REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
+REDIS_DB = int(os.getenv('REDIS_DB', '0'))
 
-@dataclass(frozen=True)
-class MarketDataConfig:
-    cache_ttl: int = int(os.getenv('MARKET_CACHE_TTL', '300'))
+# ---- Market data / storage ----
+MARKET_CACHE_TTL = int(os.getenv('MARKET_CACHE_TTL', '300'))
+DATABASE_URI = os.getenv('DATABASE_URI', 'sqlite:///trading.db')
 
-@dataclass(frozen=True)
-class DatabaseConfig:
-    uri: str = os.getenv('DATABASE_URI', 'sqlite:///trading.db')
+@dataclass(frozen=True, slots=True)
+class TrailingLevel:
+    min_profit_pct: float
+    trailing_stop_offset: float  # None means book instead of trailing
+    book_fraction: float
 
 @dataclass(frozen=True)
 class ProfitTrailingConfig:
     start_trailing_profit_pct: float = 0.005  # trailing starts at 0.5% profit
-    levels: list = (
-        {"min_profit_pct": 0.005, "trailing_stop_offset": 0.001, "book_fraction": 1.0},
-        {"min_profit_pct": 0.01,  "trailing_stop_offset": 0.006, "book_fraction": 1.0},
-        {"min_profit_pct": 0.015, "trailing_stop_offset": 0.012, "book_fraction": 1.0},
-        {"min_profit_pct": 0.02,  "trailing_stop_offset": None, "book_fraction": 0.9}
+    levels: tuple = (
+        TrailingLevel(min_profit_pct=0.005, trailing_stop_offset=0.001, book_fraction=1.0),
+        TrailingLevel(min_profit_pct=0.01,  trailing_stop_offset=0.006, book_fraction=1.0),
+        TrailingLevel(min_profit_pct=0.015, trailing_stop_offset=0.012, book_fraction=1.0),
+        TrailingLevel(min_profit_pct=0.02,  trailing_stop_offset=None, book_fraction=0.9)
     )
     fixed_stop_loss_pct: float = 0.005
     trailing_unit: str = "percent"
@@ -86,23 +84,24 @@ _ACCOUNTS = {
     }
 }
 
+# Read-only view of the accounts active at startup, so client
+# construction is one lookup with no flag re-check and no risk of
+# accidental mutation across threads.
+ACTIVE_ACCOUNTS = MappingProxyType({
+    name: MappingProxyType(acct)
+    for name, acct in _ACCOUNTS.items()
+    if acct.get("active", True)
+})
+
 # Global aliases and legacy names
 ACCOUNTS = _ACCOUNTS
-NGROK_DOMAIN = NgrokConfig().domain
-DELTA_API_URLS = DeltaApiUrls()
 FIXED_OFFSET = int(os.getenv('FIXED_OFFSET', '100'))
 MISSING_PRICE_OFFSET = int(os.getenv('MISSING_PRICE_OFFSET', '100'))
-DEFAULT_ORDER_TYPE = TradingParameters().default_order_type
-TRAILING_STOP_PERCENT = TradingParameters().trailing_stop_percent
-BASKET_ORDER_ENABLED = TradingParameters().basket_order_enabled
-LOG_FILE = LoggingConfig().log_file
-LOG_LEVEL = LoggingConfig().log_level
-REDIS_HOST = RedisConfig().host
-REDIS_PORT = RedisConfig().port
-REDIS_DB = RedisConfig().db
-MARKET_CACHE_TTL = MarketDataConfig().cache_ttl
-DATABASE_URI = DatabaseConfig().uri
 PROFIT_TRAILING_CONFIG = ProfitTrailingConfig().__dict__
+TRAILING_LEVELS = ProfitTrailingConfig().levels
+# Parallel tuple of thresholds so hot loops can bisect instead of
+# probing each level.
+TRAILING_MIN_PROFIT_PCTS = tuple(level.min_profit_pct for level in TRAILING_LEVELS)
 
 # Expose trading defaults
 SYMBOL = TRADING_SYMBOL
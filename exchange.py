@@ -1,3 +1,4 @@
+import math
 import time
 import ccxt
 import config
@@ -12,10 +13,10 @@ def get_active_account(account: str = "MAIN") -> dict:
     Returns the account configuration for the given account if it is active.
     Raises a ValueError if the account is not active or not defined.
     """
-    account_config = config.ACCOUNTS.get(account)
-    if account_config and account_config.get("active", True):
-        return account_config
-    raise ValueError(f"Account '{account}' is not active or not configured.")
+    try:
+        return config.ACTIVE_ACCOUNTS[account]
+    except KeyError:
+        raise ValueError(f"Account '{account}' is not active or not configured.") from None
 
 class DeltaExchangeClient:
     def __init__(self, account: str = "MAIN"):
@@ -55,39 +56,69 @@ class DeltaExchangeClient:
 
         self._market_cache = None
         self._market_cache_time = 0
+        # TTL is fixed at startup; bind it once so the hot order path
+        # avoids the config module attribute chain.
+        self._market_ttl = config.MARKET_CACHE_TTL
+        # Memoized tick sizes and an alias index (info.symbol /
+        # info.product_symbol -> market), both rebuilt when the market
+        # cache refills.
+        self._tick_cache = {}
+        self._tick_unit_cache = {}
+        self._market_index = {}
+
+        # Warm the market cache up front so the first order does not pay
+        # the load_markets round trip on the trading hot path.
+        try:
+            self.load_markets()
+        except Exception as e:
+            logger.warning("Market preload failed for account %s (will retry lazily): %s", account, e)
 
     def load_markets(self, reload: bool = False) -> dict:
         """
         Loads markets from the exchange. Uses cached markets if fresh.
         """
         current_time = time.time()
-        if not reload and self._market_cache and (current_time - self._market_cache_time < config.MARKET_CACHE_TTL):
+        if not reload and self._market_cache and (current_time - self._market_cache_time < self._market_ttl):
             logger.debug("Returning cached market data.")
             return self._market_cache
         try:
             markets = self.exchange.load_markets(reload)
             self._market_cache = markets
             self._market_cache_time = current_time
+            self._tick_cache.clear()
+            self._tick_unit_cache.clear()
+            self._market_index = self._build_market_index(markets)
             logger.debug("Markets loaded: %s", list(markets.keys()))
             return markets
         except Exception as e:
             logger.error("Error loading markets: %s", e)
             raise
 
+    @staticmethod
+    def _build_market_index(markets: dict) -> dict:
+        """
+        Index markets by their info.symbol and info.product_symbol aliases
+        so alias lookups are O(1) instead of a scan over all markets.
+        """
+        index = {}
+        for m in markets.values():
+            info = m.get('info', {})
+            for alias in (info.get('symbol'), info.get('product_symbol')):
+                if alias:
+                    index.setdefault(alias, m)
+        return index
+
     def get_tick_size(self, symbol: str) -> Decimal:
         """
         Fetches the tick_size for a given market symbol, with fallback
         to matching product_symbol or info.symbol fields.
+        Results are memoized until the market cache refreshes.
         """
+        cached = self._tick_cache.get(symbol)
+        if cached is not None:
+            return cached
         markets = self.load_markets()
-        market = markets.get(symbol)
-        if not market:
-            # fallback: scan for matching info.symbol or info.product_symbol
-            for m in markets.values():
-                info = m.get('info', {})
-                if info.get('symbol') == symbol or info.get('product_symbol') == symbol:
-                    market = m
-                    break
+        market = markets.get(symbol) or self._market_index.get(symbol)
         if not market:
             raise ExchangeError(f"Market metadata for {symbol} not found.")
         info = market.get('info', {})
@@ -95,12 +126,48 @@ class DeltaExchangeClient:
                (market.get('precision', {}) or {}).get('price')
         if tick is None:
             raise ExchangeError(f"Tick size for {symbol} not found in market metadata.")
-        return Decimal(str(tick))
+        tick = Decimal(str(tick))
+        self._tick_cache[symbol] = tick
+        return tick
+
+    def _tick_units(self, symbol: str) -> tuple:
+        """
+        Returns (tick_int, scale) so that tick == tick_int / scale.
+        Lets quantize_price run on native ints instead of Decimal.
+        """
+        units = self._tick_unit_cache.get(symbol)
+        if units is None:
+            tick = self.get_tick_size(symbol)
+            exponent = tick.normalize().as_tuple().exponent
+            scale = 10 ** -exponent if exponent < 0 else 1
+            units = (int(tick * scale), scale)
+            self._tick_unit_cache[symbol] = units
+        return units
 
     def quantize_price(self, price: float, symbol: str) -> float:
         """
         Quantizes a raw price to the market's tick size (rounding down).
+        Uses integer arithmetic on the scaled tick; falls back to Decimal
+        for anything the integer path cannot represent.
         """
+        try:
+            tick_int, scale = self._tick_units(symbol)
+            if tick_int > 0 and math.isfinite(price):
+                # Snap to the nearest integer only when the scaled price
+                # sits within a few ULPs of one — genuine representation
+                # noise; otherwise floor, so prices below a tick boundary
+                # still round down like the Decimal path.
+                scaled = price * scale
+                nearest = round(scaled)
+                if abs(scaled - nearest) <= 8 * math.ulp(scaled):
+                    p_int = int(nearest)
+                else:
+                    p_int = math.floor(scaled)
+                return ((p_int // tick_int) * tick_int) / scale
+        except ExchangeError:
+            raise
+        except Exception:
+            pass
         tick = self.get_tick_size(symbol)
         price_dec = Decimal(str(price))
         quantized = (price_dec // tick) * tick
@@ -193,6 +260,26 @@ class DeltaExchangeClient:
             logger.error("Error modifying bracket order %s: %s", order_id, e)
             raise
 
+    @staticmethod
+    def index_positions(positions: list) -> dict:
+        """
+        Indexes positions by product symbol (falling back to the unified
+        symbol), so callers do one hash lookup per check instead of a
+        substring scan over every position.
+        """
+        index = {}
+        for pos in positions:
+            key = pos.get('info', {}).get('product_symbol') or pos.get('symbol')
+            if key:
+                index[key] = pos
+        return index
+
+    def fetch_positions_map(self) -> dict:
+        """
+        Fetches the current open positions keyed by symbol.
+        """
+        return self.index_positions(self.fetch_positions())
+
     def fetch_positions(self) -> list:
         """
         Fetches the current open positions from the exchange.
@@ -211,6 +298,22 @@ class DeltaExchangeClient:
             raise
 
 
+# Shared clients so OrderManager, TradeManager and ProfitTrailing reuse
+# one ccxt session (and its HTTP keep-alive pool) per account instead of
+# opening separate connections each.
+_clients = {}
+
+def get_client(account: str = "MAIN") -> DeltaExchangeClient:
+    """
+    Returns a lazily created, process-wide DeltaExchangeClient for the
+    given account.
+    """
+    client = _clients.get(account)
+    if client is None:
+        client = _clients[account] = DeltaExchangeClient(account=account)
+    return client
+
+
 if __name__ == '__main__':
     # Testing each account.
     for account in ["MAIN"]:
@@ -1,240 +1,461 @@
-import logging
-import time
-import json
-import redis
-from typing import Any, Dict, Optional
-from exchange import DeltaExchangeClient
-import config
-
-logger = logging.getLogger(__name__)
-
-class OrderManager:
-    def __init__(self) -> None:
-        """
-        Initialize the OrderManager with:
-          - an exchange client instance,
-          - a local order cache dictionary,
-          - and a Redis client for persistent storage.
-        """
-        self.client: DeltaExchangeClient = DeltaExchangeClient()
-        self.orders: Dict[Any, Dict[str, Any]] = {}  # Local cache for orders.
-        self.redis_client = redis.Redis(
-            host=config.REDIS_HOST,
-            port=config.REDIS_PORT,
-            db=config.REDIS_DB
-        )
-        # List to store normalized order info
-        self.list_key = f"{config.SYMBOL}_orders"
-        # List to record raw API responses on place/cancel
-        self.order_info_key = config.ORDER_INFO_KEY
-
-    def _store_order(self, order_info: Dict[str, Any]) -> None:
-        """
-        Store or update the order info in Redis using its order ID,
-        trimming to the last 1000 entries.
-        """
-        try:
-            self.redis_client.rpush(self.list_key, json.dumps(order_info))
-            self.redis_client.ltrim(self.list_key, -1000, -1)
-        except Exception as e:
-            logger.error("Error storing order in Redis: %s", e)
-
-    def is_order_open(self, symbol: str, side: str) -> bool:
-        """
-        Check if an order is currently open for the given symbol and side.
-        First tries via the API; if that fails, falls back to local cache.
-        """
-        try:
-            for order in self.client.exchange.fetch_open_orders(symbol):
-                if (order.get('side', '').lower() == side.lower() and 
-                    order.get('status', '').lower() == 'open'):
-                    return True
-        except Exception as e:
-            logger.error("Error checking open orders via API: %s", e)
-
-        for order in self.orders.values():
-            if (order.get('symbol') == symbol and
-                order.get('side', '').lower() == side.lower() and
-                order.get('status', '').lower() == 'open'):
-                return True
-        return False
-
-    def has_open_position(self, symbol: str, side: str) -> bool:
-        """
-        Determines if there is an actual open position for the given symbol and side.
-        For 'buy' positions, size > 0 and for 'sell' positions, size < 0.
-        """
-        try:
-            for pos in self.client.fetch_positions():
-                pos_symbol = pos.get('info', {}).get('product_symbol') or pos.get('symbol', '')
-                if symbol not in pos_symbol:
-                    continue
-                try:
-                    size = float(pos.get('size') or pos.get('contracts') or 0)
-                except Exception:
-                    size = 0.0
-
-                if side.lower() == "buy" and size > 0:
-                    return True
-                if side.lower() == "sell" and size < 0:
-                    return True
-        except Exception as e:
-            logger.error("Error checking open positions via API: %s", e)
-        return False
-
-    def place_order(
-        self,
-        symbol: str,
-        side: str,
-        amount: float,
-        price: float,
-        params: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """
-        Place a new limit order, record the raw API response,
-        then update local cache plus Redis.
-        """
-        try:
-            # 1) Call the exchange
-            api_response = self.client.create_limit_order(symbol, side, amount, price, params)
-
-            # 2) Record raw API response
-            try:
-                self.redis_client.rpush(self.order_info_key, json.dumps(api_response))
-                self.redis_client.ltrim(self.order_info_key, -1000, -1)
-            except Exception as e:
-                logger.error("Error recording order API response to Redis: %s", e)
-
-            # 3) Build our normalized order info
-            order_id = api_response.get('id') or int(time.time() * 1000)
-            order_info = {
-                'id': order_id,
-                'symbol': symbol,
-                'side': side,
-                'amount': amount,
-                'price': price,
-                'params': params or {},
-                'status': api_response.get('status', 'open'),
-                'timestamp': api_response.get('timestamp', int(time.time() * 1000))
-            }
-            self.orders[order_id] = order_info
-
-            # 4) Store normalized info
-            self._store_order(order_info)
-            logger.debug("Placed order: %s", order_info)
-            return order_info
-
-        except Exception as e:
-            logger.error("Error placing order for %s: %s", symbol, e)
-            raise
-
-    def attach_bracket_to_order(
-        self,
-        order_id: Any,
-        product_id: Any,
-        product_symbol: str,
-        bracket_params: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Attach or update bracket parameters (stop loss and take profit settings)
-        to an existing order. Preserves original logic.
-        """
-        try:
-            exchange_order = self.client.modify_bracket_order(
-                order_id, product_id, product_symbol, bracket_params
-            )
-            if order_id in self.orders:
-                self.orders[order_id]['params'].update(bracket_params)
-                self.orders[order_id]['status'] = exchange_order.get('state', self.orders[order_id]['status'])
-                updated_order = self.orders[order_id]
-            else:
-                updated_order = {
-                    'id': order_id,
-                    'product_id': product_id,
-                    'product_symbol': product_symbol,
-                    'params': bracket_params,
-                    'status': exchange_order.get('state', 'open'),
-                    'timestamp': exchange_order.get('created_at', int(time.time() * 1000000))
-                }
-                self.orders[order_id] = updated_order
-
-            self._store_order(updated_order)
-            logger.debug("Bracket attached to order %s: %s", order_id, updated_order)
-            return updated_order
-
-        except Exception as e:
-            logger.error("Error attaching bracket to order %s: %s", order_id, e)
-            raise
-
-    def modify_bracket_order(
-        self,
-        order_id: Any,
-        new_bracket_params: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """
-        Modify the bracket parameters of an existing order locally.
-        """
-        if order_id not in self.orders:
-            raise ValueError("Bracket order ID not found.")
-        self.orders[order_id]['params'].update(new_bracket_params)
-        self._store_order(self.orders[order_id])
-        logger.debug("Modified bracket order %s locally: %s", order_id, self.orders[order_id])
-        return self.orders[order_id]
-
-    def cancel_order(self, order_id: Any) -> Dict[str, Any]:
-        """
-        Cancel an order given its ID. Records raw cancel response,
-        updates local cache and normalized Redis list.
-        """
-        if order_id not in self.orders:
-            raise ValueError("Order ID not found.")
-        order = self.orders[order_id]
-        symbol = order.get('symbol') or order.get('product_symbol')
-        try:
-            # 1) Cancel via exchange
-            api_response = self.client.cancel_order(order_id, symbol)
-
-            # 2) Record raw cancel response
-            try:
-                self.redis_client.rpush(self.order_info_key, json.dumps(api_response))
-                self.redis_client.ltrim(self.order_info_key, -1000, -1)
-            except Exception as e:
-                logger.error("Error recording cancel API response to Redis: %s", e)
-
-            # 3) Update normalized info
-            order['status'] = 'canceled'
-            self._store_order(order)
-            logger.debug("Canceled order %s: %s", order_id, api_response)
-            return api_response
-
-        except Exception as e:
-            logger.error("Error canceling order %s: %s", order_id, e)
-            raise
-
-if __name__ == '__main__':
-    om = OrderManager()
-    try:
-        limit_order = om.place_order(config.SYMBOL, "buy", config.QUANTITY, 45000)
-        print("Limit order placed:", limit_order)
-    except Exception as e:
-        print("Failed to place limit order:", e)
-        exit(1)
-
-    bracket_params = {
-        "bracket_stop_loss_limit_price": "40000",
-        "bracket_stop_loss_price": "40000",
-        "bracket_take_profit_limit_price": "50000",
-        "bracket_take_profit_price": "50000",
-        "bracket_stop_trigger_method": "last_traded_price"
-    }
-    try:
-        updated = om.attach_bracket_to_order(
-            order_id=limit_order['id'],
-            product_id=27,
-            product_symbol=config.SYMBOL,
-            bracket_params=bracket_params
-        )
-        print("Bracket attached:", updated)
-    except Exception as e:
-        print("Failed to attach bracket:", e)
-        exit(1)
+import heapq
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# orjson serializes to bytes in native code; Redis takes bytes directly.
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+
+from exchange import DeltaExchangeClient, get_client
+from redis_client import get_redis_client
+import config
+
+logger = logging.getLogger(__name__)
+
+# Server-side push+trim so each capped-log append is one atomic command.
+_PUSH_TRIM_LUA = "redis.call('rpush', KEYS[1], ARGV[1]); redis.call('ltrim', KEYS[1], -1000, -1)"
+
+# Statuses that count as a live local order; frozenset membership is O(1).
+_OPEN_STATES = frozenset(("open", "pending"))
+
+
+def _timestamp_ms(value: Any) -> int:
+    """
+    Normalize an order timestamp to int epoch milliseconds. Exchange
+    responses mix units (seconds, ms, us, ns) and the raw bracket
+    response carries created_at as an ISO-8601 string; the expiry heap
+    needs one comparable integer. Unparseable values map to 0, which
+    the stale cutoff treats the same way the old dict scan treated a
+    missing timestamp.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000.0
+        except ValueError:
+            pass
+    try:
+        ts = float(value)
+    except (TypeError, ValueError):
+        return 0
+    if ts < 1e11:    # seconds
+        return int(ts * 1000)
+    if ts < 1e14:    # already milliseconds
+        return int(ts)
+    if ts < 1e17:    # microseconds
+        return int(ts / 1_000)
+    return int(ts / 1_000_000)  # nanoseconds
+
+
+def _dumps(obj: Any) -> bytes:
+    """
+    Serialize for Redis, stringifying anything non-JSON-native (Decimal,
+    datetime in ccxt responses) instead of silently dropping the write.
+    """
+    return _json.dumps(obj, default=str)
+
+class OrderManager:
+    def __init__(self) -> None:
+        """
+        Initialize the OrderManager with:
+          - an exchange client instance,
+          - a local order cache dictionary,
+          - and a Redis client for persistent storage.
+        """
+        self.client: DeltaExchangeClient = get_client()
+        self.orders: Dict[Any, Dict[str, Any]] = {}  # Local cache for orders.
+        self.redis_client = get_redis_client()
+        # List to store normalized order info
+        self.list_key = f"{config.SYMBOL}_orders"
+        # Stream recording raw API responses on place/cancel, capped with
+        # an approximate MAXLEN; read it back with XRANGE/XREAD.
+        self.order_info_key = config.ORDER_INFO_KEY
+        # (symbol, side) -> set of open order ids, refreshed from the API
+        # at most every refresh interval and patched on place/cancel.
+        self._open_by_symside: Dict[tuple, set] = {}
+        # Same shape for the locally tracked orders, so the fallback
+        # check is a dict probe rather than a scan over self.orders.
+        self._local_open: Dict[tuple, set] = defaultdict(set)
+        self._open_refresh_ts: float = 0.0
+        self._open_refresh_interval: int = int(getattr(config, 'OPEN_ORDERS_REFRESH_INTERVAL', 5))
+        # Side-indexed ids plus an insertion-ordered expiry heap, so the
+        # pre-placement stale cleanup and pending checks touch only the
+        # relevant orders instead of scanning the whole dict.
+        self._ids_by_side: Dict[str, set] = defaultdict(set)
+        self._expiry_heap: list = []
+        # Short-lived positions cache for has_open_position.
+        self._positions_cache: list = []
+        self._positions_cache_ts: float = 0.0
+        # Background writer so order updates never block on Redis RTTs;
+        # batches queued payloads into one pipeline per drain.
+        # Last serialized payload per order id, to drop no-op rewrites.
+        self._last_blob: Dict[Any, bytes] = {}
+        self._redis_queue: queue.Queue = queue.Queue()
+        try:
+            self._push_trim_sha = self.redis_client.script_load(_PUSH_TRIM_LUA)
+        except Exception as e:
+            logger.error("Error registering push-trim script (falling back to rpush/ltrim): %s", e)
+            self._push_trim_sha = None
+        self._redis_writer = threading.Thread(target=self._redis_worker, daemon=True)
+        self._redis_writer.start()
+
+    def _redis_worker(self) -> None:
+        """
+        Drain queued order payloads and write them to Redis in a single
+        non-transactional pipeline per batch. Stream entries append with
+        an approximate MAXLEN cap; list entries go through the atomic
+        push-trim script (or rpush/ltrim when it is unavailable).
+        """
+        while True:
+            batch = [self._redis_queue.get()]
+            while len(batch) < 64:
+                try:
+                    batch.append(self._redis_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                trimmed = set()
+                for kind, key, data in batch:
+                    if kind == 'stream':
+                        pipe.xadd(key, {"data": data}, maxlen=1000, approximate=True)
+                    elif self._push_trim_sha:
+                        pipe.evalsha(self._push_trim_sha, 1, key, data)
+                    else:
+                        pipe.rpush(key, data)
+                        trimmed.add(key)
+                for key in trimmed:
+                    pipe.ltrim(key, -1000, -1)
+                pipe.execute()
+            except Exception as e:
+                logger.error("Error writing order batch to Redis: %s", e)
+
+    def _store_order(self, order_info: Dict[str, Any]) -> None:
+        """
+        Queue the order info for the background Redis writer, which
+        trims the list to the last 1000 entries per batch. Writes whose
+        payload is identical to the last one stored for the same order
+        id are skipped entirely.
+        """
+        try:
+            blob = _dumps(order_info)
+            order_id = order_info.get('id')
+            if order_id is not None:
+                if self._last_blob.get(order_id) == blob:
+                    return
+                self._last_blob[order_id] = blob
+            self._redis_queue.put_nowait(('list', self.list_key, blob))
+        except Exception as e:
+            logger.error("Error queueing order for Redis: %s", e)
+
+    def index_order(self, order_info: Dict[str, Any]) -> None:
+        """
+        Add a locally cached order to the side and expiry indexes that
+        back prune_stale_orders and has_local_pending.
+        """
+        oid = order_info.get('id')
+        self._ids_by_side[order_info.get('side', '').lower()].add(oid)
+        heapq.heappush(self._expiry_heap, (_timestamp_ms(order_info.get('timestamp', 0)), oid))
+
+    def prune_stale_orders(self, max_age_ms: int = 60000) -> None:
+        """
+        Drop locally cached orders older than max_age_ms. Pops only the
+        expired head of the timestamp heap rather than scanning every
+        cached order.
+        """
+        cutoff = time.time_ns() // 1_000_000 - max_age_ms
+        heap = self._expiry_heap
+        while heap and heap[0][0] < cutoff:
+            ts, oid = heapq.heappop(heap)
+            order = self.orders.get(oid)
+            if order is None:
+                continue
+            current_ts = _timestamp_ms(order.get('timestamp', 0))
+            if current_ts > ts and current_ts >= cutoff:
+                # Re-registered with a fresher timestamp; keep it.
+                heapq.heappush(heap, (current_ts, oid))
+                continue
+            del self.orders[oid]
+            self._ids_by_side[order.get('side', '').lower()].discard(oid)
+            # Drop the dedupe blob too, or long-running processes leak
+            # one serialized payload per order ever seen.
+            self._last_blob.pop(oid, None)
+
+    def has_local_pending(self, side: str) -> bool:
+        """
+        True when a locally cached order on this side is still open or
+        pending. Checks only the ids indexed for that side.
+        """
+        orders = self.orders
+        for oid in self._ids_by_side.get(side.lower(), ()):
+            order = orders.get(oid)
+            if order is not None and order.get('status') in _OPEN_STATES:
+                return True
+        return False
+
+    def _refresh_open_orders(self, symbol: str, force: bool = False) -> None:
+        """
+        Rebuild the (symbol, side) -> open order ids index from the API,
+        at most once per refresh interval unless forced.
+        """
+        now = time.time()
+        if not force and now - self._open_refresh_ts < self._open_refresh_interval:
+            return
+        try:
+            orders = self.client.exchange.fetch_open_orders(symbol)
+        except Exception as e:
+            logger.error("Error checking open orders via API: %s", e)
+            return
+        index: Dict[tuple, set] = {}
+        for order in orders:
+            if order.get('status', '').lower() != 'open':
+                continue
+            key = (symbol, order.get('side', '').lower())
+            index.setdefault(key, set()).add(order.get('id'))
+        self._open_by_symside = index
+        self._open_refresh_ts = now
+
+    def _fetch_positions_cached(self) -> list:
+        """
+        Fetch positions via the client, reusing the last response while it
+        is younger than the refresh interval.
+        """
+        now = time.time()
+        if self._positions_cache and now - self._positions_cache_ts < self._open_refresh_interval:
+            return self._positions_cache
+        positions = self.client.fetch_positions()
+        self._positions_cache = positions
+        self._positions_cache_ts = now
+        return positions
+
+    def invalidate(self) -> None:
+        """
+        Drop the open-orders and positions caches so the next check
+        refetches. Called after state-changing operations to keep the
+        write path from reading stale snapshots.
+        """
+        self._open_refresh_ts = 0.0
+        self._positions_cache = []
+        self._positions_cache_ts = 0.0
+
+    def is_order_open(self, symbol: str, side: str) -> bool:
+        """
+        Check if an order is currently open for the given symbol and side.
+        Consults the side-indexed cache (refreshed lazily from the API);
+        falls back to the local cache if the index has nothing.
+        """
+        side_l = side.lower()
+        self._refresh_open_orders(symbol)
+        if self._open_by_symside.get((symbol, side_l)):
+            return True
+        return bool(self._local_open.get((symbol, side_l)))
+
+    @staticmethod
+    def has_open_position_in(symbol: str, side: str, positions: list) -> bool:
+        """
+        Position check against an already fetched positions list, for
+        callers that hold a snapshot and should not pay another fetch.
+        """
+        side_l = side.lower()
+        for pos in positions:
+            pos_symbol = pos.get('info', {}).get('product_symbol') or pos.get('symbol', '')
+            if symbol not in pos_symbol:
+                continue
+            try:
+                size = float(pos.get('size') or pos.get('contracts') or 0)
+            except Exception:
+                size = 0.0
+
+            if side_l == "buy" and size > 0:
+                return True
+            if side_l == "sell" and size < 0:
+                return True
+        return False
+
+    def has_open_position(self, symbol: str, side: str) -> bool:
+        """
+        Determines if there is an actual open position for the given symbol and side.
+        For 'buy' positions, size > 0 and for 'sell' positions, size < 0.
+        """
+        try:
+            return self.has_open_position_in(symbol, side, self._fetch_positions_cached())
+        except Exception as e:
+            logger.error("Error checking open positions via API: %s", e)
+        return False
+
+    def place_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: float,
+        params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Place a new limit order, record the raw API response,
+        then update local cache plus Redis.
+        """
+        try:
+            # 1) Call the exchange
+            api_response = self.client.create_limit_order(symbol, side, amount, price, params)
+
+            # 2) Record raw API response via the background writer so the
+            # trading thread never blocks on Redis here.
+            try:
+                self._redis_queue.put_nowait(('stream', self.order_info_key, _dumps(api_response)))
+            except Exception as e:
+                logger.error("Error recording order API response to Redis: %s", e)
+
+            # 3) Build our normalized order info
+            order_id = api_response.get('id') or time.time_ns() // 1_000_000
+            order_info = {
+                'id': order_id,
+                'symbol': symbol,
+                'side': side,
+                'amount': amount,
+                'price': price,
+                'params': params or {},
+                'status': api_response.get('status', 'open'),
+                'timestamp': api_response.get('timestamp', time.time_ns() // 1_000_000)
+            }
+            self.orders[order_id] = order_info
+            self.index_order(order_info)
+            self._open_by_symside.setdefault((symbol, side.lower()), set()).add(order_id)
+            if order_info['status'] == 'open':
+                self._local_open[(symbol, side.lower())].add(order_id)
+            self.invalidate()
+
+            # 4) Store normalized info
+            self._store_order(order_info)
+            logger.debug("Placed order: %s", order_info)
+            return order_info
+
+        except Exception as e:
+            logger.error("Error placing order for %s: %s", symbol, e)
+            raise
+
+    def attach_bracket_to_order(
+        self,
+        order_id: Any,
+        product_id: Any,
+        product_symbol: str,
+        bracket_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Attach or update bracket parameters (stop loss and take profit settings)
+        to an existing order. Preserves original logic.
+        """
+        try:
+            exchange_order = self.client.modify_bracket_order(
+                order_id, product_id, product_symbol, bracket_params
+            )
+            if order_id in self.orders:
+                self.orders[order_id]['params'].update(bracket_params)
+                self.orders[order_id]['status'] = exchange_order.get('state', self.orders[order_id]['status'])
+                updated_order = self.orders[order_id]
+                if updated_order['status'] != 'open':
+                    local_key = (updated_order.get('symbol'), updated_order.get('side', '').lower())
+                    self._local_open[local_key].discard(order_id)
+            else:
+                updated_order = {
+                    'id': order_id,
+                    'product_id': product_id,
+                    'product_symbol': product_symbol,
+                    'params': bracket_params,
+                    'status': exchange_order.get('state', 'open'),
+                    'timestamp': exchange_order.get('created_at', time.time_ns() // 1_000_000)
+                }
+                self.orders[order_id] = updated_order
+                self.index_order(updated_order)
+
+            self._store_order(updated_order)
+            logger.debug("Bracket attached to order %s: %s", order_id, updated_order)
+            return updated_order
+
+        except Exception as e:
+            logger.error("Error attaching bracket to order %s: %s", order_id, e)
+            raise
+
+    def modify_bracket_order(
+        self,
+        order_id: Any,
+        new_bracket_params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Modify the bracket parameters of an existing order locally.
+        """
+        if order_id not in self.orders:
+            raise ValueError("Bracket order ID not found.")
+        self.orders[order_id]['params'].update(new_bracket_params)
+        self._store_order(self.orders[order_id])
+        logger.debug("Modified bracket order %s locally: %s", order_id, self.orders[order_id])
+        return self.orders[order_id]
+
+    def cancel_order(self, order_id: Any) -> Dict[str, Any]:
+        """
+        Cancel an order given its ID. Records raw cancel response,
+        updates local cache and normalized Redis list.
+        """
+        if order_id not in self.orders:
+            raise ValueError("Order ID not found.")
+        order = self.orders[order_id]
+        symbol = order.get('symbol') or order.get('product_symbol')
+        try:
+            # 1) Cancel via exchange
+            api_response = self.client.cancel_order(order_id, symbol)
+
+            # 2) Record raw cancel response via the background writer.
+            try:
+                self._redis_queue.put_nowait(('stream', self.order_info_key, _dumps(api_response)))
+            except Exception as e:
+                logger.error("Error recording cancel API response to Redis: %s", e)
+
+            # 3) Update normalized info
+            order['status'] = 'canceled'
+            open_ids = self._open_by_symside.get((symbol, order.get('side', '').lower()))
+            if open_ids:
+                open_ids.discard(order_id)
+            self._local_open[(symbol, order.get('side', '').lower())].discard(order_id)
+            self.invalidate()
+            self._store_order(order)
+            logger.debug("Canceled order %s: %s", order_id, api_response)
+            return api_response
+
+        except Exception as e:
+            logger.error("Error canceling order %s: %s", order_id, e)
+            raise
+
+if __name__ == '__main__':
+    om = OrderManager()
+    try:
+        limit_order = om.place_order(config.SYMBOL, "buy", config.QUANTITY, 45000)
+        print("Limit order placed:", limit_order)
+    except Exception as e:
+        print("Failed to place limit order:", e)
+        exit(1)
+
+    bracket_params = {
+        "bracket_stop_loss_limit_price": "40000",
+        "bracket_stop_loss_price": "40000",
+        "bracket_take_profit_limit_price": "50000",
+        "bracket_take_profit_price": "50000",
+        "bracket_stop_trigger_method": "last_traded_price"
+    }
+    try:
+        updated = om.attach_bracket_to_order(
+            order_id=limit_order['id'],
+            product_id=27,
+            product_symbol=config.SYMBOL,
+            bracket_params=bracket_params
+        )
+        print("Bracket attached:", updated)
+    except Exception as e:
+        print("Failed to attach bracket:", e)
+        exit(1)
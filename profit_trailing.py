@@ -1,13 +1,52 @@
 import time
 import logging
-import json
-from typing import Dict, Any, List, Optional, Tuple
-from exchange import DeltaExchangeClient
+from typing import Dict, Any, List, NamedTuple, Optional, Tuple
+from exchange import get_client
+from redis_client import get_redis_client
 import config
 from trade_manager import TradeManager
 
 logger = logging.getLogger(__name__)
 
+# Shared sentinel so .get('info') misses do not allocate a fresh dict.
+_EMPTY: Dict[str, Any] = {}
+
+# Fixed-stop offset as a fraction, evaluated once; the per-tick path
+# avoids the config attribute lookup and division.
+_FIXED_OFFSET_FRAC = config.FIXED_STOP_OFFSET_PERCENT / 100.0
+
+
+class PositionView(NamedTuple):
+    """Fields of an exchange position parsed once per loop iteration."""
+    key: str
+    symbol: str
+    entry: float
+    size: float
+    info: Dict[str, Any]
+
+
+def parse_position(pos: Dict[str, Any]) -> Optional[PositionView]:
+    """
+    Extracts symbol, entry price and size from a raw position dict.
+    Returns None when the entry cannot be parsed or the size is zero,
+    mirroring the early-outs the per-method parsing used to do.
+    """
+    info = pos.get('info') or _EMPTY
+    symbol = info.get('product_symbol') or pos.get('symbol', 'unknown')
+    entry_val = info.get('entry_price') or pos.get('entryPrice')
+    size_val = pos.get('size') or pos.get('contracts')
+    try:
+        entry = float(entry_val)
+    except Exception:
+        return None
+    try:
+        size = float(size_val or 0)
+    except Exception:
+        size = 0.0
+    if size == 0:
+        return None
+    return PositionView(f"{symbol}_{entry_val}_{size_val}", symbol, entry, size, info)
+
 class ProfitTrailing:
     """
     Monitors open positions and updates trailing stops using live price updates
@@ -15,162 +54,130 @@ class ProfitTrailing:
     """
     def __init__(self, ws_instance, check_interval: int = 1) -> None:
         self.ws = ws_instance
-        self.client = DeltaExchangeClient()
-        self.trade_manager = TradeManager()
+        self.client = get_client()
+        self.trade_manager = TradeManager(ws_instance)
         self.check_interval: int = check_interval
         self.position_trailing_stop: Dict[Any, float] = {}
         self.last_had_positions: bool = True
         self.last_position_fetch_time: float = 0.0
         self.position_fetch_interval: int = 5
         self.cached_positions: List[Dict[str, Any]] = []
+        self.cached_views: List[PositionView] = []
         self.last_display: Dict[Any, Dict[str, Any]] = {}
+        self._last_display_time: float = 0.0
         self.position_max_profit: Dict[Any, float] = {}
+        self._last_rule: Dict[Any, str] = {}
         self.take_profit_detected: bool = False
+        self.redis_client = get_redis_client()
 
     def fetch_open_positions(self) -> List[Dict[str, Any]]:
         try:
             positions = self.client.fetch_positions()
             open_positions: List[Dict[str, Any]] = []
             for pos in positions:
-                try:
-                    size = float(pos.get('size') or pos.get('contracts') or 0)
-                except Exception:
-                    size = 0.0
-                if size != 0:
-                    pos_symbol = pos.get('info', {}).get('product_symbol') or pos.get('symbol', '')
-                    if pos_symbol and config.SYMBOL in pos_symbol:
-                        open_positions.append(pos)
+                view = parse_position(pos)
+                if view is not None and config.SYMBOL in view.symbol:
+                    open_positions.append(pos)
             return open_positions
         except Exception as e:
             logger.error("Error fetching open positions: %s", e)
             return []
 
     def compute_profit_pct(self, pos: Dict[str, Any], live_price: float) -> Optional[float]:
-        entry = pos.get('info', {}).get('entry_price') or pos.get('entryPrice')
-        try:
-            entry = float(entry)
-        except Exception:
+        view = parse_position(pos)
+        if view is None:
             return None
-        size = 0.0
-        try:
-            size = float(pos.get('size') or pos.get('contracts') or 0)
-        except Exception:
-            pass
-        if size > 0:
-            return (live_price - entry) / entry
-        else:
-            return (entry - live_price) / entry
+        diff = live_price - view.entry if view.size > 0 else view.entry - live_price
+        return diff / view.entry
 
     def compute_raw_profit(self, pos: Dict[str, Any], live_price: float) -> Optional[float]:
-        entry = pos.get('info', {}).get('entry_price') or pos.get('entryPrice')
-        try:
-            entry = float(entry)
-        except Exception:
+        view = parse_position(pos)
+        if view is None:
             return None
-        size = 0.0
-        try:
-            size = float(pos.get('size') or pos.get('contracts') or 0)
-        except Exception:
-            pass
-        if size > 0:
-            return (live_price - entry) * size
-        else:
-            return (entry - live_price) * abs(size)
+        diff = live_price - view.entry if view.size > 0 else view.entry - live_price
+        return diff * abs(view.size)
 
     def update_trailing_stop(self, pos: Dict[str, Any], live_price: float) -> Tuple[Optional[float], Optional[float], Optional[str]]:
-        pos_symbol = pos.get('info', {}).get('product_symbol') or pos.get('symbol', 'unknown')
-        entry_val = pos.get('info', {}).get('entry_price') or pos.get('entryPrice')
-        size_val = pos.get('size') or pos.get('contracts')
-        key = f"{pos_symbol}_{entry_val}_{size_val}"
-        try:
-            entry = float(entry_val)
-        except Exception:
-            return None, None, None
-        try:
-            size = float(size_val or 0)
-        except Exception:
-            size = 0.0
-        if size == 0:
+        view = parse_position(pos)
+        if view is None:
             return None, None, None
+        return self._update_trailing_stop_view(view, live_price)
 
+    def _update_trailing_stop_view(self, view: PositionView, live_price: float) -> Tuple[float, float, str]:
+        entry, size, key = view.entry, view.size, view.key
         current_profit = live_price - entry if size > 0 else entry - live_price
         prev_max = self.position_max_profit.get(key, 0)
-        new_max = max(prev_max, current_profit)
-        self.position_max_profit[key] = new_max
+
+        # While the price sits at or below the high-water mark the stop
+        # is unchanged, so reuse the cached value as long as the active
+        # rule would come out the same.
+        if current_profit <= prev_max:
+            rule = "lock_50" if (self.take_profit_detected and prev_max >= 400) else "fixed_stop"
+            cached_stop = self.position_trailing_stop.get(key)
+            if cached_stop is not None and self._last_rule.get(key) == rule:
+                return cached_stop, prev_max / entry, rule
+            new_max = prev_max
+        else:
+            new_max = current_profit
+            self.position_max_profit[key] = new_max
 
         if self.take_profit_detected and new_max >= 400:
             new_trailing = entry + (new_max / 2) if size > 0 else entry - (new_max / 2)
             rule = "lock_50"
         else:
-            default_offset = entry * (config.FIXED_STOP_OFFSET_PERCENT / 100)
+            default_offset = entry * _FIXED_OFFSET_FRAC
             new_trailing = entry - default_offset if size > 0 else entry + default_offset
             rule = "fixed_stop"
 
         self.position_trailing_stop[key] = new_trailing
+        self._last_rule[key] = rule
         profit_pct = new_max / entry
         return new_trailing, profit_pct, rule
 
     def book_profit(self, pos: Dict[str, Any], live_price: float) -> bool:
-        pos_symbol = pos.get('info', {}).get('product_symbol') or pos.get('symbol', 'unknown')
-        entry_val = pos.get('info', {}).get('entry_price') or pos.get('entryPrice')
-        size_val = pos.get('size') or pos.get('contracts')
-        key = f"{pos_symbol}_{entry_val}_{size_val}"
-        try:
-            size = float(pos.get('size') or pos.get('contracts') or 0)
-        except Exception:
-            size = 0.0
+        view = parse_position(pos)
+        if view is None:
+            return False
+        return self._book_profit_view(view, live_price)
 
-        trailing_stop, _, rule = self.update_trailing_stop(pos, live_price)
+    def _book_profit_view(self, view: PositionView, live_price: float) -> bool:
+        key, size = view.key, view.size
+        trailing_stop, _, _ = self._update_trailing_stop_view(view, live_price)
         if trailing_stop is None:
             return False
 
-        if rule == "lock_50":
-            if size > 0 and live_price < trailing_stop:
-                try:
-                    close = self.trade_manager.place_market_order(
-                        config.SYMBOL, "sell", size,
-                        params={"time_in_force": "ioc"}, force=True
-                    )
-                    logger.info("Trailing stop triggered for %s. Closed: %s", key, close)
-                    return True
-                except Exception as e:
-                    logger.error("Failed to close %s on trailing stop: %s", key, e)
-                    return False
-            elif size < 0 and live_price > trailing_stop:
-                try:
-                    close = self.trade_manager.place_market_order(
-                        config.SYMBOL, "buy", abs(size),
-                        params={"time_in_force": "ioc"}, force=True
-                    )
-                    logger.info("Trailing stop triggered for %s. Closed: %s", key, close)
-                    return True
-                except Exception as e:
-                    logger.error("Failed to close %s on trailing stop: %s", key, e)
-                    return False
-        else:
-            if size > 0 and live_price < trailing_stop:
-                try:
-                    close = self.trade_manager.place_market_order(
-                        config.SYMBOL, "sell", size,
-                        params={"time_in_force": "ioc"}, force=True
-                    )
-                    logger.info("Trailing stop triggered for %s. Closed: %s", key, close)
-                    return True
-                except Exception as e:
-                    logger.error("Failed to close %s on trailing stop: %s", key, e)
-                    return False
-            elif size < 0 and live_price > trailing_stop:
-                try:
-                    close = self.trade_manager.place_market_order(
-                        config.SYMBOL, "buy", abs(size),
-                        params={"time_in_force": "ioc"}, force=True
-                    )
-                    logger.info("Trailing stop triggered for %s. Closed: %s", key, close)
-                    return True
-                except Exception as e:
-                    logger.error("Failed to close %s on trailing stop: %s", key, e)
-                    return False
-        return False
+        # Both rules close the same way once the stop is crossed; only
+        # the crossing direction and closing side depend on the sign.
+        crossed = (size > 0 and live_price < trailing_stop) or \
+                  (size < 0 and live_price > trailing_stop)
+        if not crossed:
+            return False
+
+        side = "sell" if size > 0 else "buy"
+        try:
+            close = self.trade_manager.place_market_order(
+                config.SYMBOL, side, abs(size),
+                params={"time_in_force": "ioc"}, force=True
+            )
+            logger.info("Trailing stop triggered for %s. Closed: %s", key, close)
+            return True
+        except Exception as e:
+            logger.error("Failed to close %s on trailing stop: %s", key, e)
+            return False
+
+    def _publish_displays(self, changed_items: List[Tuple[Any, Dict[str, Any]]]) -> None:
+        """
+        Push the changed per-position display hashes to Redis in one
+        pipeline, so observability costs a single round trip per tick
+        regardless of how many positions updated.
+        """
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, display in changed_items:
+                pipe.hset(f"display:{key}", mapping={k: str(v) for k, v in display.items()})
+            pipe.execute()
+        except Exception as e:
+            logger.error("Error publishing display updates to Redis: %s", e)
 
     def track(self) -> None:
         """
@@ -190,6 +197,12 @@ class ProfitTrailing:
             now = time.time()
             if now - self.last_position_fetch_time >= self.position_fetch_interval:
                 self.cached_positions = self.fetch_open_positions()
+                # Parse once per refresh; the per-tick loop then runs on
+                # the flat views with no dict probing at all.
+                self.cached_views = [
+                    view for view in map(parse_position, self.cached_positions)
+                    if view is not None
+                ]
                 self.last_position_fetch_time = now
                 if not self.cached_positions:
                     if self.last_had_positions:
@@ -197,85 +210,97 @@ class ProfitTrailing:
                         self.last_had_positions = False
                     self.position_trailing_stop.clear()
                     self.position_max_profit.clear()
+                    self._last_rule.clear()
                     time.sleep(self.check_interval)
                     continue
 
             live_price = self.ws.current_price
             if live_price is None:
-                time.sleep(self.check_interval)
+                self.ws.wait_for_price_update(timeout=self.check_interval)
                 continue
 
             if self.cached_positions and not self.last_had_positions:
                 logger.info("Open positions detected. Profit trailing resumed.")
                 self.last_had_positions = True
 
-            for pos in self.cached_positions:
-                entry_num = None
-                try:
-                    entry_num = float(pos.get('info', {}).get('entry_price') or pos.get('entryPrice'))
-                except Exception:
-                    pass
+            # Snapshot the view list once per tick: the refresh above
+            # rebinds the attribute to a fully built list, so a local
+            # alias is a consistent snapshot with no locking and no
+            # repeated attribute loads inside the loop.
+            views = self.cached_views
+            changed_displays: List[Tuple[Any, Dict[str, Any]]] = []
+            # Only the stop-breach check rides every tick; the display/
+            # log/publish block keeps the old check_interval cadence so
+            # a busy feed does not multiply log and Redis traffic.
+            publish = now - self._last_display_time >= self.check_interval
+            if publish:
+                self._last_display_time = now
+            for view in views:
+                key = view.key
+                if publish:
+                    entry_num = view.entry
+                    size = view.size
 
-                size = 0.0
-                try:
-                    size = float(pos.get('size') or pos.get('contracts') or 0)
-                except Exception:
-                    pass
-                if size == 0:
-                    continue
+                    # Inline of compute_profit_pct/compute_raw_profit on the
+                    # pre-parsed fields: one signed diff feeds both.
+                    diff = live_price - entry_num if size > 0 else entry_num - live_price
+                    profit_pct = diff / entry_num
+                    profit_display = profit_pct * 100
+                    raw_profit = diff * abs(size)
+                    profit_usd = raw_profit / 1000
 
-                profit_pct = self.compute_profit_pct(pos, live_price) or 0
-                profit_display = profit_pct * 100
-                raw_profit = self.compute_raw_profit(pos, live_price) or 0
-                profit_usd = raw_profit / 1000
+                    trailing_stop, _, rule = self._update_trailing_stop_view(view, live_price)
+                    max_profit = self.position_max_profit.get(key, 0)
 
-                trailing_stop, _, rule = self.update_trailing_stop(pos, live_price)
-                max_profit = self.position_max_profit.get(
-                    f"{pos.get('info', {}).get('product_symbol')}_{pos.get('info', {}).get('entry_price')}_{pos.get('size')}",
-                    0
-                )
+                    # API PnL
+                    try:
+                        api_pnl = float(view.info.get('unrealized_pnl') or 0)
+                        api_entry = float(view.info.get('entry_price') or 0)
+                    except Exception:
+                        api_pnl = 0.0
+                        api_entry = 0.0
 
-                # API PnL
-                try:
-                    api_pnl = float(pos.get('info', {}).get('unrealized_pnl') or 0)
-                    api_entry   = float(pos.get('info', {}).get('entry_price') or 0)
-
-                    
-                except Exception:
-                    api_pnl = 0.0
-                    api_entry = 0.0
-
-
-                side = "long" if size > 0 else "short"
-                key = f"{pos.get('info', {}).get('product_symbol')}_{pos.get('info', {}).get('entry_price')}_{pos.get('size')}"
-
-                display = {
-                    "entry": entry_num,
-                    "api_entry": round(api_entry, 2),         # include in your display dict
-                    "live": live_price,
-                    "profit_pct": round(profit_display, 2),
-                    "profit_usd": round(profit_usd, 2),
-                    "api_pnl": round(api_pnl, 2),
-                    "rule": rule,
-                    "sl": round(trailing_stop or 0, 2),
-                    "size": size,
-                    "side": side,
-                    "max_profit": round(max_profit, 2)
-                }
-
-                if self.last_display.get(key) != display:
-                    logger.info(
-                        f"Order: {key} | Size: {size:.0f} ({side}) | Entry: {entry_num:.1f} | API_Entry: {api_entry:.1f} | "
-                        f"Live: {live_price:.1f} | PnL: {profit_display:.2f}% | "
-                        f"USD: {profit_usd:.2f} | API PnL: {api_pnl:.2f} | "
-                        f"Max Profit: {max_profit:.2f} | Rule: {rule} | SL: {trailing_stop:.2f}"
-                    )
-                    self.last_display[key] = display
+                    side = "long" if size > 0 else "short"
+
+                    display = {
+                        "entry": entry_num,
+                        "api_entry": round(api_entry, 2),         # include in your display dict
+                        "live": live_price,
+                        "profit_pct": round(profit_display, 2),
+                        "profit_usd": round(profit_usd, 2),
+                        "api_pnl": round(api_pnl, 2),
+                        "rule": rule,
+                        "sl": round(trailing_stop or 0, 2),
+                        "size": size,
+                        "side": side,
+                        "max_profit": round(max_profit, 2)
+                    }
+
+                    if self.last_display.get(key) != display:
+                        # Lazy %-formatting: the eleven float conversions only
+                        # run when an INFO handler will actually emit the line.
+                        logger.info(
+                            "Order: %s | Size: %.0f (%s) | Entry: %.1f | API_Entry: %.1f | "
+                            "Live: %.1f | PnL: %.2f%% | USD: %.2f | API PnL: %.2f | "
+                            "Max Profit: %.2f | Rule: %s | SL: %.2f",
+                            key, size, side, entry_num, api_entry, live_price,
+                            profit_display, profit_usd, api_pnl, max_profit, rule,
+                            trailing_stop
+                        )
+                        self.last_display[key] = display
+                        changed_displays.append((key, display))
 
                 try:
-                    if self.book_profit(pos, live_price):
+                    if self._book_profit_view(view, live_price):
                         logger.info("Profit booked for order %s.", key)
                 except Exception as e:
                     logger.error("Error booking profit for %s: %s", key, e)
 
-            time.sleep(self.check_interval)
+            if changed_displays:
+                self._publish_displays(changed_displays)
+
+            # Wake on the next tick instead of a fixed sleep: reacts to a
+            # price jump immediately and burns no CPU while the feed is
+            # quiet. check_interval caps the wait so position refreshes
+            # still happen on schedule.
+            self.ws.wait_for_price_update(timeout=self.check_interval)
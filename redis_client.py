@@ -0,0 +1,49 @@
+import socket
+import redis
+import config
+
+# Keepalive knobs are Linux-specific; probe for them so the pool still
+# builds on other platforms.
+_keepalive_options = {}
+if hasattr(socket, 'TCP_KEEPIDLE'):
+    _keepalive_options = {
+        socket.TCP_KEEPIDLE: 30,
+        socket.TCP_KEEPINTVL: 10,
+        socket.TCP_KEEPCNT: 3,
+    }
+
+# One blocking pool shared by every consumer (OrderManager, TradeManager,
+# SignalProcessor) so warm sockets are reused instead of each class
+# holding its own connections, and idle links are kept alive/health
+# checked rather than re-handshaken after quiet periods.
+POOL = redis.BlockingConnectionPool(
+    host=config.REDIS_HOST,
+    port=config.REDIS_PORT,
+    db=config.REDIS_DB,
+    max_connections=16,
+    socket_keepalive=True,
+    socket_keepalive_options=_keepalive_options,
+    health_check_interval=30,
+)
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    Returns a Redis client backed by the shared connection pool.
+    """
+    return redis.Redis(connection_pool=POOL)
+
+
+def get_blocking_client() -> redis.Redis:
+    """
+    Returns a dedicated, non-pooled client for blocking commands such as
+    BRPOP, which monopolise their connection for the duration of the
+    call and would otherwise starve the shared pool.
+    """
+    return redis.Redis(
+        host=config.REDIS_HOST,
+        port=config.REDIS_PORT,
+        db=config.REDIS_DB,
+        socket_keepalive=True,
+        socket_keepalive_options=_keepalive_options,
+    )
@@ -1,14 +1,58 @@
+import re
 import time
-import json
-import redis
+import queue
+import hashlib
 import logging
-from typing import Optional, Any, Dict
+import threading
+
+# orjson parses straight from bytes in native code; stdlib json also
+# accepts bytes, so neither path needs the decode hop.
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Any, Dict, List
 from order_manager import OrderManager
 from trade_manager import TradeManager
+from redis_client import get_blocking_client, get_redis_client
 import config
 
 logger = logging.getLogger(__name__)
 
+# Offset multipliers folded once at import, so each signal costs one
+# multiply per price instead of a config lookup and division apiece.
+_BUY_ENTRY_F = 1 - config.ORDER_ENTRY_OFFSET_PERCENT / 100
+_BUY_SL_F = 1 - config.ORDER_SL_OFFSET_PERCENT / 100
+_BUY_TP_F = 1 + config.ORDER_TP_OFFSET_PERCENT / 100
+_SELL_ENTRY_F = 1 + config.ORDER_ENTRY_OFFSET_PERCENT / 100
+_SELL_SL_F = 1 + config.ORDER_SL_OFFSET_PERCENT / 100
+_SELL_TP_F = 1 - config.ORDER_TP_OFFSET_PERCENT / 100
+
+# Two case-insensitive scans classify the signal text; the old chain of
+# .lower() plus repeated substring searches walked the string ~8 times.
+# The TP scan is separate because a shared non-overlapping pass drops a
+# "tp" whose letters straddle a consumed side token (e.g. "shortprofit").
+_SIDE_RE = re.compile(r"buy|sell|short", re.I)
+_TP_RE = re.compile(r"take profit|tp", re.I)
+
+
+def classify_signal_text(text: str) -> tuple:
+    """
+    Returns (side, is_tp) for a signal text, where side is 'buy', 'sell'
+    or None. Keeps the old precedence: 'buy' wins over 'sell'/'short',
+    and 'tp'/'take profit' anywhere (even inside another word, as
+    before) marks a take-profit signal.
+    """
+    tokens = {m.lower() for m in _SIDE_RE.findall(text)}
+    if "buy" in tokens:
+        side = "buy"
+    elif tokens:
+        side = "sell"
+    else:
+        side = None
+    return side, _TP_RE.search(text) is not None
+
 class SignalProcessor:
     """
     Processes trading signals from Redis and executes order actions.
@@ -20,14 +64,19 @@ class SignalProcessor:
         self.ws = ws_instance
         self.profit_trailing = profit_trailing
         self.order_manager = OrderManager()
-        self.trade_manager = TradeManager()
-        self.redis_client = redis.Redis(
-            host=config.REDIS_HOST,
-            port=config.REDIS_PORT,
-            db=config.REDIS_DB
-        )
-        self.last_signal: Optional[Dict[str, Any]] = None
+        self.trade_manager = TradeManager(ws_instance)
+        # Shares the process-wide pool instead of opening its own links.
+        self.redis_client = get_redis_client()
+        # BRPOP holds its connection while blocked, so the signal wait
+        # gets a dedicated link instead of one from the shared pool.
+        self._signal_conn = get_blocking_client()
+        # Hand-off between the BRPOP producer thread and the processing
+        # loop, so ingestion keeps draining Redis while orders place.
+        self._signal_queue: queue.Queue = queue.Queue(maxsize=16)
         self.last_executed_side: Optional[str] = None
+        # Two workers so the independent positions/open-orders reads at
+        # the top of process_signal overlap instead of paying both RTTs.
+        self._fetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sig-fetch")
 
     def fetch_signal(self, key: str = "BTCUSDT_signal") -> Optional[Dict[str, Any]]:
         try:
@@ -35,48 +84,87 @@ class SignalProcessor:
             data = self.redis_client.lindex(key, -1)
             if not data:
                 return None
-            # If data is bytes, decode it (assuming UTF-8 encoding)
-            if isinstance(data, bytes):
-                data = data.decode("utf-8")
-            return json.loads(data)
+            return _json.loads(data)
         except Exception as e:
             logger.error("Error fetching signal from Redis: %s", e)
             return None
 
 
-    def cancel_conflicting_orders(self, symbol: str, new_side: str) -> None:
+    def wait_for_signal(self, key: str = "BTCUSDT_signal", timeout: int = 5) -> Optional[Dict[str, Any]]:
+        """
+        Block until a producer pushes a signal onto the list, up to
+        `timeout` seconds. Wakes on the push itself instead of polling,
+        so signal-to-action latency is one network round trip. Returns
+        None on a quiet window; Redis errors propagate so callers can
+        tell an outage apart from silence and back off.
+        """
+        item = self._signal_conn.brpop(key, timeout=timeout)
+        if not item:
+            return None
+        _, data = item
+        return _json.loads(data)
+
+    def _cancel_orders_bulk(self, symbol: str, ids: List[Any]) -> None:
+        """
+        Cancel a batch of order ids in one exchange call when the ccxt
+        client exposes a bulk endpoint, falling back to per-id cancels
+        (which also keeps the partial-failure behavior of the old loops).
+        """
+        if not ids:
+            return
+        exchange = self.order_manager.client.exchange
+        # ccxt defines cancel_orders on every exchange (raising
+        # NotSupported where there is no batch endpoint), so capability
+        # lives in the has map, not the attribute.
+        if len(ids) > 1 and getattr(exchange, 'has', {}).get('cancelOrders'):
+            try:
+                exchange.cancel_orders(ids, symbol)
+                logger.info("Canceled orders in bulk: %s", ids)
+                return
+            except Exception as e:
+                logger.error("Bulk cancel failed, retrying per order: %s", e)
+        for order_id in ids:
+            try:
+                self.order_manager.client.cancel_order(order_id, symbol)
+                logger.info("Canceled order: %s", order_id)
+            except Exception as e:
+                logger.error("Error canceling order %s: %s", order_id, e)
+
+    def cancel_conflicting_orders(self, symbol: str, new_side: str,
+                                  orders: Optional[List[Dict[str, Any]]] = None) -> None:
         try:
-            orders = self.order_manager.client.exchange.fetch_open_orders(symbol)
-            if orders:
-                for order in orders:
-                    if order.get("status", "").lower() != "open":
-                        continue
-                    order_side = order.get("side", "").lower()
-                    if new_side == "" or order_side != new_side.lower():
-                        try:
-                            self.order_manager.client.cancel_order(order["id"], symbol)
-                            logger.info("Canceled conflicting order: %s", order["id"])
-                        except Exception as e:
-                            logger.error("Error canceling order %s: %s", order["id"], e)
+            if orders is None:
+                orders = self.order_manager.client.exchange.fetch_open_orders(symbol)
+            new_side_l = new_side.lower()
+            ids = [
+                order["id"] for order in orders or []
+                if order.get("status", "").lower() == "open"
+                and (new_side == "" or order.get("side", "").lower() != new_side_l)
+            ]
+            self._cancel_orders_bulk(symbol, ids)
         except Exception as e:
             logger.error("Error fetching open orders: %s", e)
 
-    def cancel_same_side_orders(self, symbol: str, side: str) -> None:
+    def cancel_same_side_orders(self, symbol: str, side: str,
+                                orders: Optional[List[Dict[str, Any]]] = None) -> None:
         try:
-            pending_orders = self.order_manager.client.exchange.fetch_open_orders(symbol)
-            for order in pending_orders:
-                if order.get("side", "").lower() == side.lower() and order.get("status", "").lower() == "open":
-                    try:
-                        self.order_manager.client.cancel_order(order["id"], symbol)
-                        logger.info("Canceled same-side order: %s", order["id"])
-                    except Exception as e:
-                        logger.error("Error canceling same-side order %s: %s", order["id"], e)
+            if orders is None:
+                orders = self.order_manager.client.exchange.fetch_open_orders(symbol)
+            side_l = side.lower()
+            ids = [
+                order["id"] for order in orders or []
+                if order.get("side", "").lower() == side_l
+                and order.get("status", "").lower() == "open"
+            ]
+            self._cancel_orders_bulk(symbol, ids)
         except Exception as e:
             logger.error("Error fetching same-side pending orders: %s", e)
 
-    def open_pending_order_exists(self, symbol: str, side: str) -> bool:
+    def open_pending_order_exists(self, symbol: str, side: str,
+                                  orders: Optional[List[Dict[str, Any]]] = None) -> bool:
         try:
-            orders = self.order_manager.client.exchange.fetch_open_orders(symbol)
+            if orders is None:
+                orders = self.order_manager.client.exchange.fetch_open_orders(symbol)
             for order in orders:
                 if order.get("side", "").lower() == side.lower() and order.get("status", "").lower() == "open":
                     return True
@@ -85,15 +173,39 @@ class SignalProcessor:
             logger.error("Error checking for pending orders: %s", e)
             return False
 
+    def _await_cancel_settlement(self, symbol: str, timeout: float = 2.0) -> None:
+        """
+        Poll with a short exponential backoff until the canceled orders
+        have dropped off the book (the two cancel passes together clear
+        every open order), replacing the old fixed two-second pause.
+        """
+        delay = 0.1
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if not self.order_manager.client.exchange.fetch_open_orders(symbol):
+                    return
+            except Exception as e:
+                logger.error("Error polling open orders after cancel: %s", e)
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(delay, remaining))
+            delay *= 2
+
     def process_signal(self, signal_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         if not signal_data:
             return None
 
         last_signal = signal_data.get("last_signal", {})
-        signal_text = last_signal.get("text", "").lower()
+        side, is_tp = classify_signal_text(last_signal.get("text", ""))
+        # Unknown sides fall through the cancel/position checks as sells,
+        # matching the old substring chain's else branch.
+        check_side = "buy" if side == "buy" else "sell"
 
         # Set or reset the TP flag based on the signal text.
-        if "take profit" in signal_text or "tp" in signal_text:
+        if is_tp:
             logger.info("Take profit signal detected. Activating 50% lock rule.")
             if self.profit_trailing:
                 self.profit_trailing.take_profit_detected = True
@@ -118,38 +230,56 @@ class SignalProcessor:
             raw_price = live_price
             logger.info("Using live price as fallback: %.2f", raw_price)
 
+        # Kick off the two independent exchange reads together; the wall
+        # time is then the slower round trip rather than the sum, and the
+        # single open-orders list feeds every later check in this call.
+        positions_future = self._fetch_pool.submit(self.order_manager.client.fetch_positions)
+        orders_future = self._fetch_pool.submit(
+            self.order_manager.client.exchange.fetch_open_orders, "BTCUSD"
+        )
+        try:
+            open_orders: Optional[List[Dict[str, Any]]] = orders_future.result()
+        except Exception as e:
+            logger.error("Error fetching open orders: %s", e)
+            open_orders = None
+
+        positions: List[Dict[str, Any]] = []
         try:
-            positions = self.order_manager.client.fetch_positions()
-            for pos in positions:
-                pos_symbol = pos.get("info", {}).get("product_symbol") or pos.get("symbol")
-                if pos_symbol and "BTCUSD" in pos_symbol:
-                    try:
-                        pos_size = float(pos.get("size") or pos.get("contracts") or 0)
-                    except Exception:
-                        pos_size = 0.0
-                    if "buy" in signal_text and pos_size < 0:
-                        logger.info("Opposite signal received: Forcing closure of existing short position before buying.")
-                        self.trade_manager.place_market_order(
-                            "BTCUSD", "buy", abs(pos_size), params={"time_in_force": "ioc"}, force=True
-                        )
-                        time.sleep(2)
-                    elif "sell" in signal_text and pos_size > 0:
-                        logger.info("Opposite signal received: Forcing closure of existing long position before selling.")
-                        self.trade_manager.place_market_order(
-                            "BTCUSD", "sell", pos_size, params={"time_in_force": "ioc"}, force=True
-                        )
-                        time.sleep(2)
+            positions = positions_future.result()
+            pos = self.order_manager.client.index_positions(positions).get("BTCUSD")
+            if pos is not None:
+                try:
+                    pos_size = float(pos.get("size") or pos.get("contracts") or 0)
+                except Exception:
+                    pos_size = 0.0
+                if side == "buy" and pos_size < 0:
+                    logger.info("Opposite signal received: Forcing closure of existing short position before buying.")
+                    # place_market_order(force=True) polls until the
+                    # closure is visible, so no extra pause is needed.
+                    self.trade_manager.place_market_order(
+                        "BTCUSD", "buy", abs(pos_size), params={"time_in_force": "ioc"}, force=True
+                    )
+                elif side == "sell" and pos_size > 0:
+                    logger.info("Opposite signal received: Forcing closure of existing long position before selling.")
+                    self.trade_manager.place_market_order(
+                        "BTCUSD", "sell", pos_size, params={"time_in_force": "ioc"}, force=True
+                    )
         except Exception as e:
             logger.error("Error handling opposite positions: %s", e)
 
-        # Cancel conflicting and same-side orders.
-        self.cancel_conflicting_orders("BTCUSD", "buy" if "buy" in signal_text else "sell")
-        self.cancel_same_side_orders("BTCUSD", "buy" if "buy" in signal_text else "sell")
-        time.sleep(2)
+        # Cancel conflicting and same-side orders from the one prefetched list.
+        self.cancel_conflicting_orders("BTCUSD", check_side, orders=open_orders)
+        self.cancel_same_side_orders("BTCUSD", check_side, orders=open_orders)
+        self._await_cancel_settlement("BTCUSD")
 
-        if self.order_manager.has_open_position("BTCUSD", "buy" if "buy" in signal_text else "sell"):
-            logger.info("An open %s position exists for BTCUSD. Skipping new order placement.",
-                        "buy" if "buy" in signal_text else "sell")
+        # Reuse the positions snapshot from the top of this call; only a
+        # failed prefetch falls back to a fresh (TTL-cached) lookup.
+        if positions:
+            has_open = self.order_manager.has_open_position_in("BTCUSD", check_side, positions)
+        else:
+            has_open = self.order_manager.has_open_position("BTCUSD", check_side)
+        if has_open:
+            logger.info("An open %s position exists for BTCUSD. Skipping new order placement.", check_side)
             return None
 
         if raw_supply is None or raw_demand is None:
@@ -157,25 +287,26 @@ class SignalProcessor:
             return None
 
         # Calculate entry, stop-loss, and take profit prices.
-        if "buy" in signal_text:
-            entry_price = float(raw_price) - (float(raw_price) * (config.ORDER_ENTRY_OFFSET_PERCENT / 100))
-            sl_price = float(raw_price) - (float(raw_price) * (config.ORDER_SL_OFFSET_PERCENT / 100))
-            tp_price = float(raw_price) + (float(raw_price) * (config.ORDER_TP_OFFSET_PERCENT / 100))
-        elif "sell" in signal_text or "short" in signal_text:
-            entry_price = float(raw_price) + (float(raw_price) * (config.ORDER_ENTRY_OFFSET_PERCENT / 100))
-            sl_price = float(raw_price) + (float(raw_price) * (config.ORDER_SL_OFFSET_PERCENT / 100))
-            tp_price = float(raw_price) - (float(raw_price) * (config.ORDER_TP_OFFSET_PERCENT / 100))
+        p = float(raw_price)
+        if side == "buy":
+            entry_price = p * _BUY_ENTRY_F
+            sl_price = p * _BUY_SL_F
+            tp_price = p * _BUY_TP_F
+        elif side == "sell":
+            entry_price = p * _SELL_ENTRY_F
+            sl_price = p * _SELL_SL_F
+            tp_price = p * _SELL_TP_F
         else:
-            logger.warning("Unable to determine side for signal: %s", signal_text)
+            logger.warning("Unable to determine side for signal: %s", last_signal.get("text"))
             return None
 
         logger.info("Signal: %s | Entry: %.2f | SL: %.2f | TP: %.2f",
                     last_signal.get("text"), entry_price, sl_price, tp_price)
 
         try:
-            limit_order = self.order_manager.place_order("BTCUSD", 
-                                                        "buy" if "buy" in signal_text else "sell", 
-                                                        1, 
+            limit_order = self.order_manager.place_order("BTCUSD",
+                                                        side,
+                                                        1,
                                                         entry_price,
                                                         params={"time_in_force": "gtc"})
             logger.info("Limit order placed: %s", limit_order)
@@ -183,11 +314,15 @@ class SignalProcessor:
             logger.error("Failed to place limit order: %s", e)
             return None
 
+        # One formatting pass per price; repr-precision str(float) is
+        # pointless since the exchange client re-quantizes to tick size.
+        sl = f"{sl_price:.2f}"
+        tp = f"{tp_price:.2f}"
         bracket_params = {
-            "bracket_stop_loss_limit_price": str(sl_price),
-            "bracket_stop_loss_price": str(sl_price),
-            "bracket_take_profit_limit_price": str(tp_price),
-            "bracket_take_profit_price": str(tp_price),
+            "bracket_stop_loss_limit_price": sl,
+            "bracket_stop_loss_price": sl,
+            "bracket_take_profit_limit_price": tp,
+            "bracket_take_profit_price": tp,
             "bracket_stop_trigger_method": "last_traded_price"
         }
         try:
@@ -204,30 +339,78 @@ class SignalProcessor:
             return None
 
 
-    def signals_are_different(self, new_signal: Dict[str, Any], old_signal: Optional[Dict[str, Any]]) -> bool:
-        new_text = new_signal.get("last_signal", {}).get("text", "").strip().lower()
-        if not new_text:
+    def _is_new_signal(self, signal_data: Dict[str, Any]) -> bool:
+        """
+        Server-side dedup: SET NX on a fingerprint of the signal text
+        atomically gates execution, so duplicate pushes (or a second
+        worker) run each distinct signal once per TTL window. Replaces
+        the old in-memory last-signal text comparison, and like it,
+        treats an empty text as nothing to process.
+        """
+        text = signal_data.get("last_signal", {}).get("text", "").strip().lower()
+        if not text:
             return False
-        old_text = ""
-        if old_signal:
-            old_text = old_signal.get("last_signal", {}).get("text", "").strip().lower()
-        return new_text != old_text
+        sig_id = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        try:
+            return bool(self.redis_client.set(f"sig:seen:{sig_id}", 1, nx=True, ex=300))
+        except Exception as e:
+            # Fail open: reprocessing beats silently dropping a signal.
+            logger.error("Error checking signal dedup key: %s", e)
+            return True
+
+    def _signal_producer(self, sleep_interval: int) -> None:
+        """
+        Pull signals off Redis into the hand-off queue. Runs on its own
+        thread so ingestion continues while the consumer is busy placing
+        orders, instead of signals backing up in Redis. A quiet BRPOP
+        window re-arms immediately; errors back off exponentially so a
+        Redis outage does not spin the loop or flood the log.
+        """
+        delay = 1.0
+        while True:
+            try:
+                signal_data = self.wait_for_signal(timeout=sleep_interval)
+            except Exception as e:
+                logger.error("Error waiting for signal from Redis: %s", e)
+                time.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            delay = 1.0
+            if signal_data:
+                self._signal_queue.put(signal_data)
 
     def process_signals_loop(self, sleep_interval: int = 5) -> None:
+        """
+        Consume signals as they arrive. A producer thread parks in BRPOP
+        and feeds the queue; this loop drains it latest-wins, and
+        Redis-side fingerprinting drops repeated pushes of the same
+        text. `sleep_interval` only caps how long a single BRPOP blocks
+        before re-issuing.
+        """
         logger.info("Starting signal processing loop...")
+        producer = threading.Thread(
+            target=self._signal_producer, args=(sleep_interval,),
+            name="signal-producer", daemon=True
+        )
+        producer.start()
         while True:
-            signal_data = self.fetch_signal()
-            if signal_data and self.signals_are_different(signal_data, self.last_signal):
-                logger.info("New signal detected.")
-                processed = self.process_signal(signal_data)
-                if processed:
-                    logger.info("Order processed successfully: %s", processed)
-                else:
-                    logger.info("Signal processing skipped or failed.")
-                self.last_signal = signal_data
+            signal_data = self._signal_queue.get()
+            # Latest-wins: collapse any backlog that accumulated while
+            # the previous signal was executing.
+            try:
+                while True:
+                    signal_data = self._signal_queue.get_nowait()
+            except queue.Empty:
+                pass
+            if not self._is_new_signal(signal_data):
+                logger.debug("Duplicate signal skipped.")
+                continue
+            logger.info("New signal detected.")
+            processed = self.process_signal(signal_data)
+            if processed:
+                logger.info("Order processed successfully: %s", processed)
             else:
-                logger.debug("No new signal or signal identical to last one.")
-            time.sleep(sleep_interval)
+                logger.info("Signal processing skipped or failed.")
 
 if __name__ == "__main__":
     # For testing, you may create a dummy websocket instance.
@@ -1,32 +1,74 @@
 import time
 import logging
-import uuid
-import redis
+import itertools
 from typing import Any, Dict, Optional
-from exchange import DeltaExchangeClient
+from exchange import DeltaExchangeClient, get_client
 from order_manager import OrderManager
+from redis_client import get_redis_client
 import config
 
 logger = logging.getLogger(__name__)
 TOLERANCE = 1e-6  # Tolerance for treating near-zero sizes as zero
+# A websocket price older than this is treated as stale and re-fetched
+# over REST instead.
+_PRICE_STALE_NS = 5_000_000_000
+# Fallback ids when the exchange response lacks one: a process counter
+# plus millisecond stamp, unique without uuid4's per-call entropy read.
+_local_id = itertools.count()
 
 class TradeManager:
     """
     Manages trade execution by placing market orders and monitoring trailing stops.
     Includes verification that market orders actually fill or close positions.
     """
-    def __init__(self) -> None:
-        self.client: DeltaExchangeClient = DeltaExchangeClient()
+    def __init__(self, ws_instance: Optional[Any] = None) -> None:
+        self.client: DeltaExchangeClient = get_client()
         self.order_manager: OrderManager = OrderManager()
+        self.ws = ws_instance
         self.highest_price: Optional[float] = None
-        # Redis (if needed for signals)
-        self.redis_client = redis.Redis(
-            host=config.REDIS_HOST,
-            port=config.REDIS_PORT,
-            db=config.REDIS_DB
-        )
+        # Last trailing stop actually sent to the exchange, so flat
+        # markets do not repeat the same modify call.
+        self._last_stop_sent: Optional[float] = None
+        # Redis (if needed for signals); shares the pooled connections.
+        self.redis_client = get_redis_client()
+
+    def _await_position_state(self, predicate, timeout: float = 2.0) -> tuple:
+        """
+        Poll fetch_positions with a short exponential backoff until the
+        predicate holds or the timeout lapses. The first check runs
+        immediately, so fast fills pay no fixed pause. Failed fetches
+        never reach the predicate (an empty list would look "closed" to
+        the force path); they just retry, and a timeout with no
+        successful snapshot returns unverified. Returns the last
+        positions snapshot and whether the predicate was satisfied.
+        """
+        delay = 0.1
+        deadline = time.monotonic() + timeout
+        positions: list = []
+        while True:
+            try:
+                positions = self.client.fetch_positions()
+            except Exception as e:
+                logger.error("Error fetching positions during settlement wait: %s", e)
+            else:
+                if predicate(positions):
+                    return positions, True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return positions, False
+            time.sleep(min(delay, remaining))
+            delay *= 2
 
     def get_current_price(self, product_symbol: str) -> float:
+        # Prefer the websocket's in-memory price: a fresh tick makes the
+        # REST round trip unnecessary on every trailing-stop poll.
+        ws = self.ws
+        if ws is not None:
+            price = ws.current_price
+            if price is not None:
+                last = ws.last_update_time
+                if last is not None and time.monotonic_ns() - last < _PRICE_STALE_NS:
+                    return price
         try:
             ticker = self.client.exchange.fetch_ticker(product_symbol)
             price = float(ticker.get("last"))
@@ -38,6 +80,8 @@ class TradeManager:
     def monitor_trailing_stop(self, bracket_order_id: Any, product_symbol: str, trailing_stop_percent: float, update_interval: int = 10) -> None:
         # unchanged
         logger.info("Starting trailing stop monitoring for %s", product_symbol)
+        # Hoisted out of the loop; every iteration is then one multiply.
+        stop_mult = 1 - trailing_stop_percent / 100.0
         try:
             self.highest_price = self.get_current_price(product_symbol)
             logger.info("Initial highest price: %s", self.highest_price)
@@ -57,19 +101,34 @@ class TradeManager:
                 self.highest_price = current_price
                 logger.info("New highest price reached: %s", self.highest_price)
 
-            new_stop_loss = self.highest_price * (1 - trailing_stop_percent / 100.0)
+            new_stop_loss = self.highest_price * stop_mult
+            rounded_stop = round(new_stop_loss, 2)
+            if rounded_stop == self._last_stop_sent:
+                # Stop has not moved a tick since the last modify; skip
+                # the redundant API call.
+                if self.ws is not None:
+                    self.ws.wait_for_price_update(timeout=update_interval)
+                else:
+                    time.sleep(update_interval)
+                continue
             logger.info("Current price: %.2f, New stop loss calculated: %.2f", current_price, new_stop_loss)
             stop_loss_order = {
                 "order_type": "limit_order",
-                "stop_price": f"{round(new_stop_loss, 2)}",
-                "limit_price": f"{round(new_stop_loss * 0.99, 2)}"
+                "stop_price": f"{rounded_stop:.2f}",
+                "limit_price": f"{new_stop_loss * 0.99:.2f}"
             }
             try:
                 modified_order = self.order_manager.modify_bracket_order(bracket_order_id, stop_loss_order)
+                self._last_stop_sent = rounded_stop
                 logger.info("Bracket order modified: %s", modified_order)
             except Exception as e:
                 logger.error("Error modifying bracket order: %s", e)
-            time.sleep(update_interval)
+            # Wake on the next tick when the feed is attached; the
+            # interval only caps the wait.
+            if self.ws is not None:
+                self.ws.wait_for_price_update(timeout=update_interval)
+            else:
+                time.sleep(update_interval)
 
     def place_market_order(self, symbol: str, side: str, amount: float, params: Optional[Dict[str, Any]] = None, force: bool = False) -> Optional[Dict[str, Any]]:
         side_lower = side.lower()
@@ -78,11 +137,8 @@ class TradeManager:
         if not force:
             # unchanged safety checks for open orders and positions
             try:
-                positions = self.client.fetch_positions()
-                for pos in positions:
-                    pos_symbol = (pos.get("info", {}).get("product_symbol") or pos.get("symbol") or "")
-                    if symbol not in pos_symbol:
-                        continue
+                pos = self.client.fetch_positions_map().get(symbol)
+                if pos is not None:
                     try:
                         size = float(pos.get("size") or pos.get("contracts") or 0)
                     except Exception:
@@ -97,25 +153,20 @@ class TradeManager:
                 logger.error("Error fetching positions: %s", e)
 
             try:
-                open_orders = self.client.exchange.fetch_open_orders(symbol)
-                for order in open_orders:
-                    if order.get("side", "").lower() == side_lower:
-                        logger.info("A pending %s order exists for %s. Skipping market order.", side, symbol)
-                        return None
-            except Exception as e:
-                logger.error("Error fetching open orders: %s", e)
-
-            # stale local orders cleanup
-            current_time = int(time.time() * 1000)
-            stale_ids = [oid for oid, o in self.order_manager.orders.items() if current_time - o.get("timestamp", 0) > 60000]
-            for oid in stale_ids:
-                del self.order_manager.orders[oid]
-
-            # local cache pending check
-            for o in self.order_manager.orders.values():
-                if o.get("side", "").lower() == side_lower and o.get("status") in ["open", "pending"]:
-                    logger.info("Local pending %s order exists for %s. Skipping new order.", side, symbol)
+                # Goes through OrderManager's TTL-cached (symbol, side)
+                # index instead of a fresh fetch_open_orders round trip.
+                if self.order_manager.is_order_open(symbol, side_lower):
+                    logger.info("A pending %s order exists for %s. Skipping market order.", side, symbol)
                     return None
+            except Exception as e:
+                logger.error("Error checking open orders: %s", e)
+
+            # Stale cleanup and pending check via OrderManager's side and
+            # expiry indexes rather than full scans of the order dict.
+            self.order_manager.prune_stale_orders()
+            if self.order_manager.has_local_pending(side_lower):
+                logger.info("Local pending %s order exists for %s. Skipping new order.", side, symbol)
+                return None
 
         # apply reduce_only if forced
         if force:
@@ -124,7 +175,7 @@ class TradeManager:
 
         try:
             order = self.client.exchange.create_order(symbol, "market", side, amount, None, params or {})
-            order_id = order.get("id", str(uuid.uuid4()))
+            order_id = order.get("id") or f"local-{next(_local_id)}-{time.time_ns() // 1_000_000}"
             order_info = {
                 "id": order_id,
                 "symbol": symbol,
@@ -132,43 +183,44 @@ class TradeManager:
                 "amount": amount,
                 "params": params or {},
                 "status": order.get("status", "open"),
-                "timestamp": order.get("timestamp", int(time.time() * 1000))
+                "timestamp": order.get("timestamp", time.time_ns() // 1_000_000)
             }
             self.order_manager.orders[order_id] = order_info
+            self.order_manager.index_order(order_info)
             self.order_manager._store_order(order_info)
-            time.sleep(1)
 
-            # Verification
-            positions_after = self.client.fetch_positions()
+            # Verification: wait only as long as the exchange needs for
+            # the expected position transition, not a fixed pause.
             if force:
                 # we expect no positions for symbol
-                still_open = any(
-                    (pos.get('info', {}).get('product_symbol') or pos.get('symbol', '')).startswith(symbol)
-                    and float(pos.get('size') or pos.get('contracts') or 0) != 0
-                    for pos in positions_after
-                )
-                if still_open:
-                    logger.error("Market CLOSE order NOT verified: position still open for %s.", symbol)
-                    return None
-                logger.info("Market CLOSE order verified: no position for %s.", symbol)
+                def settled(positions: list) -> bool:
+                    pos = self.client.index_positions(positions).get(symbol)
+                    if pos is None:
+                        return True
+                    return float(pos.get('size') or pos.get('contracts') or 0) == 0
             else:
                 # we expect an open position for symbol
-                verified = False
-                for pos in positions_after:
-                    pos_symbol = (pos.get('info', {}).get('product_symbol') or pos.get('symbol') or "")
-                    if not pos_symbol.startswith(symbol):
-                        continue
+                def settled(positions: list) -> bool:
+                    pos = self.client.index_positions(positions).get(symbol)
+                    if pos is None:
+                        return False
                     try:
                         size = float(pos.get('size') or pos.get('contracts') or 0)
                     except Exception:
                         size = 0.0
-                    if (side_lower == "buy" and size > 0) or (side_lower == "sell" and size < 0):
-                        logger.info("Market OPEN order verified for %s.", symbol)
-                        verified = True
-                        break
+                    return (side_lower == "buy" and size > 0) or (side_lower == "sell" and size < 0)
+
+            _, verified = self._await_position_state(settled)
+            if force:
+                if not verified:
+                    logger.error("Market CLOSE order NOT verified: position still open for %s.", symbol)
+                    return None
+                logger.info("Market CLOSE order verified: no position for %s.", symbol)
+            else:
                 if not verified:
                     logger.error("Market OPEN order NOT verified for %s.", symbol)
                     return None
+                logger.info("Market OPEN order verified for %s.", symbol)
 
             logger.info("Market order placed and verified: %s", order_info)
             return order_info